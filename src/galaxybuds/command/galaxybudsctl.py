@@ -10,15 +10,59 @@ Examples:
 
 import argparse
 import dataclasses
+import enum
+import functools
 import logging
+import operator
+import queue
 import sys
 import threading
-from typing import Union
+from typing import Callable, Union
 
-from galaxybuds.galaxybudspro import device
+from galaxybuds.galaxybudspro import device, messages
 
 ALL_PRINTABLE = ['serial', 'sku', 'status', 'version']
 
+def _cli_names(values, sep='-') -> dict[str, enum.Enum]:
+    """Returns a sorted map from command line names to enum values."""
+
+    return dict(sorted((v.name.lower().replace('_', sep), v) for v in values))
+
+EQUALIZER_TYPES = _cli_names(device.EqualizerType)
+NOISE_CONTROLS = _cli_names(device.NoiseControls)
+TOUCHPAD_OPTIONS = _cli_names(device.TouchpadOption, sep='_')
+
+@functools.lru_cache(maxsize=None)
+def _field_spec(cls: type) -> tuple[tuple[str, str], ...]:
+    """Returns (name, name without leading underscores) for each field in a dataclass type."""
+
+    return tuple((field.name, field.name.lstrip('_')) for field in dataclasses.fields(cls))
+
+def _tuple_getter(names: tuple[str, ...]) -> Callable[[object], tuple]:
+    """Returns a function getting the named attributes as a tuple.
+
+    Unlike operator.attrgetter, this also returns a tuple for zero or one names.
+    """
+    if len(names) > 1:
+        return operator.attrgetter(*names)
+    if names:
+        getter = operator.attrgetter(names[0])
+        return lambda obj: (getter(obj),)
+    return lambda _: ()
+
+@functools.lru_cache(maxsize=None)
+def _field_getter(cls: type) -> tuple[tuple[str, ...], Callable[[object], tuple]]:
+    """Returns the field names of a dataclass type, and a getter for their values."""
+
+    names = tuple(name for name, _ in _field_spec(cls))
+    return names, _tuple_getter(names)
+
+def print_fields(obj) -> None:
+    """Prints the fields of a dataclass, without copying it like dataclasses.asdict()."""
+
+    names, get_values = _field_getter(type(obj))
+    sys.stdout.write(''.join('  {}: {}\n'.format(name, value) for name, value in zip(names, get_values(obj))))
+
 def print_information(buds: device.Device, toprint: set[str]):
     if 'serial' in toprint:
         print('Serial:', ', '.join(buds.get_debug_serial_number()))
@@ -29,41 +73,48 @@ def print_information(buds: device.Device, toprint: set[str]):
     if 'status' in toprint:
         print('Status:')
         buds.status.wait_for(lambda: buds.status.latest_extended_status)
-        for k, v in dataclasses.asdict(buds.status.latest_extended_status).items():
-            print('  {}: {}'.format(k, v))
+        print_fields(buds.status.latest_extended_status)
 
     if 'version' in toprint:
         print('Version:')
         buds.status.wait_for(lambda: buds.status.version_info)
-        for k, v in dataclasses.asdict(buds.status.version_info).items():
-            print('  {}: {}'.format(k, v))
+        print_fields(buds.status.version_info)
+
+_EARBUD_NAMES = {
+    frozenset({'left'}): 'left',
+    frozenset({'right'}): 'right',
+    frozenset({'left', 'right'}): 'left and right',
+}
 
 def find_my_earbuds(buds: device.Device, which: set[str]):
     buds.start_find_my_earbuds()
     try:
         buds.mute_earbud('left' not in which, 'right' not in which)
-        print('Chirping {} for 30 seconds...'.format(' and '.join(sorted(which))))
-        time.sleep(30)
+        print('Chirping {} for 30 seconds...'.format(_EARBUD_NAMES[frozenset(which)]))
+        threading.Event().wait(timeout=30)
     except KeyboardInterrupt:
         print('Stopped chirp.')
     finally:
         buds.stop_find_my_earbuds()
 
-def set_equalizer(buds: device.Device, typ: device.EqualizerType):
-    buds.set_equalizer_type(typ)
-    print('Upated equalizer type.')
+def set_equalizer(typ: device.EqualizerType) -> tuple[device.AckedRequest, str]:
+    return device.equalizer_type_request(typ), 'Upated equalizer type.'
+
+def set_noise_cancelation(typ: device.NoiseControls) -> tuple[device.AckedRequest, str]:
+    return device.noise_controls_request(typ), 'Upated noise cancelation mode.'
+
+def set_touchpad_enabled(enabled: bool) -> tuple[device.AckedRequest, str]:
+    return device.touchpad_enabled_request(enabled), 'Updated touchpad locking.'
 
-def set_noise_cancelation(buds: device.Device, typ: device.NoiseControls):
-    buds.set_noise_controls(typ)
-    print('Upated noise cancelation mode.')
+def set_touchpad_options(options: list[device.TouchpadOption]) -> tuple[device.AckedRequest, str]:
+    return device.touchpad_option_request(options[0], options[1]), 'Updated touchpad options.'
 
-def set_touchpad_enabled(buds: device.Device, enabled: bool):
-    buds.set_touchpad_enabled(enabled)
-    print('Updated touchpad locking.')
+def apply_settings(buds: device.Device, settings: list[tuple[device.AckedRequest, str]]):
+    """Sends all setting requests in one batch, and prints their messages once acknowledged."""
 
-def set_touchpad_options(buds: device.Device, options: list[device.TouchpadOption]):
-    buds.set_touchpad_option(options[0], options[1])
-    print('Updated touchpad options.')
+    buds.batch(*(req for req, _ in settings))
+    for _, msg in settings:
+        print(msg)
 
 def listen_for_touch_and_hold_app(buds: device.Device):
     print('Listening for touch and hold events...', file=sys.stderr)
@@ -84,37 +135,69 @@ def listen_for_touch_and_hold_app(buds: device.Device):
     finally:
         unlisten()
 
-def listen_for_status_changes(buds: device.Device):
-    try:
-        buds.status.wait_for(lambda: buds.status.latest_merged_extended_status)
-        prev_ext_status = buds.status.latest_merged_extended_status
+@functools.lru_cache(maxsize=None)
+def _status_getter(cls: type) -> tuple[tuple[str, ...], Callable[[object], tuple]]:
+    """Returns the printable status names of a dataclass type, and a getter for their values."""
 
-        print('Listening for status changes...', file=sys.stderr)
+    # Private fields are shown through their public properties, if any.
+    names = tuple(name for raw_name, name in _field_spec(cls) if raw_name == name or hasattr(cls, name))
+    return names, _tuple_getter(names)
 
-        while True:
-            buds.status.wait_for(lambda: buds.status.latest_merged_extended_status != prev_ext_status)
-            ext_status = buds.status.latest_merged_extended_status
+def _status_changes(old, new) -> list[tuple[str, object]]:
+    """Returns (name, new value) for each printable status field that differs."""
 
-            if not ext_status:
-                print('Connection lost.', file=sys.stderr)
-                break
+    field_names, get_values = _status_getter(type(new))
+    old_values, new_values = get_values(old), get_values(new)
+    if old_values == new_values:
+        return []
+    return [(name, nv) for name, ov, nv in zip(field_names, old_values, new_values) if ov != nv]
 
-            for field_name in [field.name for field in dataclasses.fields(prev_ext_status)] + ['extra_high_ambient']:
-                if field_name.startswith('_'):
-                    field_name = field_name.lstrip('_')
-                    if not hasattr(ext_status, field_name):
-                        continue
+def listen_for_status_changes(buds: device.Device):
+    changes = queue.SimpleQueue()
+    prev_ext_status = None
+    def listener(ext_status: Union[messages.MsgExtendedStatusUpdated, None]):
+        nonlocal prev_ext_status
 
-                value = getattr(ext_status, field_name)
+        if not ext_status:
+            changes.put(None)
+            return
 
-                if value == getattr(prev_ext_status, field_name):
-                    continue
+        if prev_ext_status:
+            diff = _status_changes(prev_ext_status, ext_status)
+            if diff:
+                # One string per update, so it can be written at once.
+                changes.put(''.join('STATUS {} {}\n'.format(name, value) for name, value in diff))
 
-                print('STATUS', field_name, value)
+        prev_ext_status = ext_status
+
+    unlisten = buds.status.listen_for_merged_extended_status(listener)
+    try:
+        print('Listening for status changes...', file=sys.stderr)
 
-            prev_ext_status = ext_status
+        for lines in iter(changes.get, None):
+            sys.stdout.write(lines)
+
+        print('Connection lost.', file=sys.stderr)
     except KeyboardInterrupt:
         print('Stopped listening.', file=sys.stderr)
+    finally:
+        unlisten()
+
+def parse_touchpad_options(s: str) -> list[device.TouchpadOption]:
+    options = [TOUCHPAD_OPTIONS[v.lower()] for v in s.split(',')]
+    if len(options) == 1:
+        options *= 2
+    if len(options) != 2:
+        print('Expected exactly two touchpad options, but got {}'.format(s), file=sys.stderr)
+    return options
+
+# (args attribute, value parser, setting request builder)
+SETTINGS = (
+    ('set_equalizer', EQUALIZER_TYPES.__getitem__, set_equalizer),
+    ('set_noise_cancelation', NOISE_CONTROLS.__getitem__, set_noise_cancelation),
+    ('set_touchpad', lambda s: s == 'unlocked', set_touchpad_enabled),
+    ('set_touchpad_options', parse_touchpad_options, set_touchpad_options),
+)
 
 def main():
     parser = argparse.ArgumentParser(description='Control Galaxy Buds Pro earbuds over Bluetooth.')
@@ -126,13 +209,13 @@ def main():
     parser.add_argument('--find-my-earbuds', nargs='?', const='both', help='enable a loud chirp in the buds for 30 seconds',
                         choices=['both', 'left', 'right'])
     parser.add_argument('--set-equalizer', help='sets the sound equalizer mode',
-                        choices=sorted(v.name.lower().replace('_', '-') for v in device.EqualizerType))
+                        choices=EQUALIZER_TYPES)
     parser.add_argument('--set-noise-cancelation', help='sets the noise cancelation mode',
-                        choices=sorted(v.name.lower().replace('_', '-') for v in device.NoiseControls))
+                        choices=NOISE_CONTROLS)
     parser.add_argument('--set-touchpad', help='sets whether the touchpad is locked',
                         choices=['locked', 'unlocked'])
     parser.add_argument('--set-touchpad-options', help='sets the touch-and-hold functionality of each earbud',
-                        metavar='LEFT[,RIGHT] {{{}}}'.format(','.join(sorted(v.name.lower() for v in device.TouchpadOption))))
+                        metavar='LEFT[,RIGHT] {{{}}}'.format(','.join(TOUCHPAD_OPTIONS)))
     parser.add_argument('--listen-for', help='listens for touch-and-hold events and prints them to stdout',
                         choices=['touch-and-hold-app', 'status-changes'])
     args = parser.parse_args()
@@ -153,22 +236,10 @@ def main():
         if args.find_my_earbuds:
             find_my_earbuds(buds, args.find_my_earbuds)
 
-        if args.set_equalizer:
-            set_equalizer(buds, device.EqualizerType[args.set_equalizer.replace('-', '_').upper()])
-
-        if args.set_noise_cancelation:
-            set_noise_cancelation(buds, device.NoiseControls[args.set_noise_cancelation.replace('-', '_').upper()])
-
-        if args.set_touchpad:
-            set_touchpad_enabled(buds, args.set_touchpad == 'unlocked')
+        settings = [make(parse(getattr(args, name))) for name, parse, make in SETTINGS if getattr(args, name)]
 
-        if args.set_touchpad_options:
-            args.set_touchpad_options = [device.TouchpadOption[v.upper()] for v in args.set_touchpad_options.split(',')]
-            if len(args.set_touchpad_options) == 1:
-                args.set_touchpad_options *= 2
-            if len(args.set_touchpad_options) != 2:
-                print('Expected exactly two touchpad options, but got {}'.format(','.join(args.set_touchpad_options)), file=sys.stderr)
-            set_touchpad_options(buds, args.set_touchpad_options)
+        if settings:
+            apply_settings(buds, settings)
 
         if args.listen_for == 'touch-and-hold-app':
             listen_for_touch_and_hold_app(buds)
@@ -1,12 +1,18 @@
 import contextlib
 import enum
+import logging
+import queue
 import threading
-from typing import Callable, Type, TypeVar, Union
-
-import bluetooth
+from typing import TYPE_CHECKING, Callable, Type, TypeVar, Union
 
 from . import frames, redirect_messages, requests
 
+if TYPE_CHECKING:
+    # Imported lazily, since loading PyBluez isn't free.
+    import bluetooth
+
+LOGGER = logging.getLogger('galaxybudspro.device')
+
 class EqualizerType(enum.Enum):
     NORMAL = 0
     BASS_BOOST = 1
@@ -27,6 +33,53 @@ class TouchpadOption(enum.Enum):
     APP5 = 5 # Configurable in the app.
     APP6 = 6 # Configurable in the app.
 
+_ENCODED = {}
+
+def _encoded(fn: Callable[..., frames.Frame], *args) -> bytes:
+    """Returns the encoded frame of a request builder, computed once per arguments.
+
+    Only use this for builders with few distinct arguments.
+    """
+    key = (fn, args)
+    data = _ENCODED.get(key)
+    if data is None:
+        data = _ENCODED[key] = fn(*args).encode()
+    return data
+
+# The ID of the UniversalAcknowledgement redirect a request expects, and the request frame.
+AckedRequest = tuple[int, frames.Frame]
+
+def equalizer_type_request(v: EqualizerType) -> AckedRequest:
+    """Returns a request for Device.batch() to set the sound equalizing."""
+
+    if not (0 <= v.value <= 5):
+        raise ValueError('expected a value in [0, 5]: {}'.format(v))
+
+    return 0x86, requests.set_equalizer_type(v.value)
+
+def noise_controls_request(v: NoiseControls) -> AckedRequest:
+    """Returns a request for Device.batch() to set the noise reduction level."""
+
+    if not (0 <= v.value <= 2):
+        raise ValueError('expected a value in [0, 2]: {}'.format(v))
+
+    return 0x78, requests.noise_controls(v.value)
+
+def touchpad_enabled_request(enabled: bool) -> AckedRequest:
+    """Returns a request for Device.batch() to set whether the touchpad should be enabled."""
+
+    return 0x90, requests.lock_touchpad(not enabled)
+
+def touchpad_option_request(left: TouchpadOption, right: TouchpadOption) -> AckedRequest:
+    """Returns a request for Device.batch() to set the actions for touching the earbuds."""
+
+    if not (2 <= left.value <= 6):
+        raise ValueError('expected a left value in [2, 6]: {}'.format(left))
+    if not (2 <= right.value <= 6):
+        raise ValueError('expected a right value in [2, 6]: {}'.format(right))
+
+    return 0x92, requests.set_touchpad_option(left.value, right.value)
+
 _DeviceSubclass = TypeVar('_DeviceSubclass', bound='Device')
 
 class Device:
@@ -35,10 +88,13 @@ class Device:
     This class is thread-safe.
     """
 
-    def __init__(self, sock: bluetooth.BluetoothSocket):
+    def __init__(self, sock: 'bluetooth.BluetoothSocket'):
         self.__sock = sock
-        self.__dispatcher = frames.FrameDispatcher(frames.FrameReceiver(sock))
-        self.__send_lock = threading.Lock()
+        self.__receiver = frames.FrameReceiver(sock)
+        self.__dispatcher = frames.FrameDispatcher(self.__receiver)
+        self.__sendq = queue.SimpleQueue()
+        self.__sender = threading.Thread(target=self.__run_send, name=type(self).__name__ + 'Sender', daemon=True)
+        self.__sender.start()
         self.status = requests.MessageCache(self.__dispatcher)
 
     def __enter__(self):
@@ -49,15 +105,21 @@ class Device:
 
     def close(self):
         self.status.close()
+        self.__sendq.put(None)
+        self.__sender.join()
+        self.__sender = None
         self.__sock.close()
         self.__sock = None
         self.__dispatcher.close()
         self.__dispatcher = None
+        self.__receiver = None
 
     @classmethod
     def open(cls: Type[_DeviceSubclass], address: str=None) -> _DeviceSubclass:
         """Opens a Bluetooth socket and returns a device."""
 
+        import bluetooth
+
         devs = bluetooth.find_service(name='GEARMANAGER', uuid='00001101-0000-1000-8000-00805F9B34FB', address=address)
 
         if len(devs) != 1:
@@ -76,8 +138,7 @@ class Device:
         """Returns the SKU (product code) of the left and right earbud."""
 
         with self.__dispatcher.oneshot(0x22) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.debug_sku().encode())
+            self.__send(_encoded(requests.debug_sku))
             result = get()
         return result.data if result else None
 
@@ -85,8 +146,7 @@ class Device:
         """Returns the serial number of the left and right earbud."""
 
         with self.__dispatcher.oneshot(0x29) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.debug_serial_number().encode())
+            self.__send(_encoded(requests.debug_serial_number))
             result = get()
         return result.data if result else None
 
@@ -96,47 +156,32 @@ class Device:
         This stops automatically when the Bluetooth socket is closed.
         """
         with self.__oneshot_ack(0xA0) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.start_find_my_earbuds().encode())
+            self.__send(_encoded(requests.start_find_my_earbuds))
             get()
 
     def stop_find_my_earbuds(self):
         """Stops the chirping started with start_find_my_earbuds()."""
 
         with self.__oneshot_ack(0xA1) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.stop_find_my_earbuds().encode())
+            self.__send(_encoded(requests.stop_find_my_earbuds))
             get()
 
     def mute_earbud(self, left: bool, right: bool) -> None:
         """Mutes the find-my-earbuds chirp."""
 
         with self.__oneshot_ack(0xA2) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.mute_earbud(left, right).encode())
+            self.__send(_encoded(requests.mute_earbud, bool(left), bool(right)))
             get()
 
     def set_equalizer_type(self, v: EqualizerType) -> None:
         """Sets the sound equalizing."""
 
-        if not (0 <= v.value <= 5):
-            raise ValueError('expected a value in [0, 5]: {}'.format(v))
-
-        with self.__oneshot_ack(0x86) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.set_equalizer_type(v.value).encode())
-            get()
+        self.batch(equalizer_type_request(v))
 
     def set_noise_controls(self, v: NoiseControls) -> None:
         """Sets the noise reduction level."""
 
-        if not (0 <= v.value <= 2):
-            raise ValueError('expected a value in [0, 2]: {}'.format(v))
-
-        with self.__oneshot_ack(0x78) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.noise_controls(v.value).encode())
-            get()
+        self.batch(noise_controls_request(v))
 
     def set_noise_reduction(self, enabled: bool) -> None:
         """Sets the noise reduction state.
@@ -144,30 +189,36 @@ class Device:
         This is likely an older version of set_noise_controls().
         """
         with self.__dispatcher.oneshot(0x77, predicate=lambda msg: msg.noise_controls_update == int(enabled)) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.set_noise_reduction(enabled).encode())
+            self.__send(requests.set_noise_reduction(enabled).encode())
             get()
 
     def set_touchpad_enabled(self, enabled: bool) -> None:
         """Sets whether the touchpad should be enabled or not."""
 
-        with self.__oneshot_ack(0x90) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.lock_touchpad(not enabled).encode())
-            get()
+        self.batch(touchpad_enabled_request(enabled))
 
     def set_touchpad_option(self, left: TouchpadOption, right: TouchpadOption) -> None:
         """Sets the actions for touching the earbuds."""
 
-        if not (2 <= left.value <= 6):
-            raise ValueError('expected a left value in [2, 6]: {}'.format(left))
-        if not (2 <= right.value <= 6):
-            raise ValueError('expected a right value in [2, 6]: {}'.format(right))
+        self.batch(touchpad_option_request(left, right))
 
-        with self.__oneshot_ack(0x92) as get:
-            with self.__send_lock:
-                self.__sock.send(requests.set_touchpad_option(left.value, right.value).encode())
-            get()
+    def batch(self, *reqs: AckedRequest) -> None:
+        """Sends all requests, and then waits for all acknowledgements.
+
+        This saves round-trips compared to sending one request at a
+        time. The requests should have distinct acknowledgement IDs.
+
+        Example:
+
+          buds.batch(
+            equalizer_type_request(EqualizerType.SOFT),
+            noise_controls_request(NoiseControls.ANC))
+        """
+        with contextlib.ExitStack() as stack:
+            getters = [stack.enter_context(self.__oneshot_ack(redirect_id)) for redirect_id, _ in reqs]
+            self.__send(b''.join(frame.encode() for _, frame in reqs))
+            for get in getters:
+                get()
 
     def listen_for_touch_and_hold_app(self, func: Callable[[Union[TouchpadOption, None]], None]) -> Callable[[], None]:
         """Waits for the user to touch-and-hold to open an app.
@@ -191,6 +242,25 @@ class Device:
         self.__dispatcher.listen(0x93, listener)
         return lambda: self.__dispatcher.unlisten(0x93, listener)
 
+    def __send(self, data: bytes) -> None:
+        """Queues encoded frames to be sent by the background thread.
+
+        This doesn't wait for the write. If it fails, the receiver is
+        closed, so pending oneshots return None instead of waiting for a
+        response that can't arrive.
+        """
+        self.__sendq.put(data)
+
+    def __run_send(self) -> None:
+        """Main function for the background sender thread."""
+
+        for data in iter(self.__sendq.get, None):
+            try:
+                self.__sock.sendall(data)
+            except Exception:
+                LOGGER.exception('Device sender thread failure', exc_info=True)
+                self.__receiver.close()
+
     @contextlib.contextmanager
     def __oneshot_ack(self, redirect_id: int, **kwargs) -> Callable[[], redirect_messages.RedirectMsg]:
         """Like dispatcher.oneshot(), but waits for a UniversalAcknowledgement with the given redirect ID."""
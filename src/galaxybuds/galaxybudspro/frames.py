@@ -1,47 +1,58 @@
+from binascii import crc_hqx
 from collections.abc import Callable
 import contextlib
 import dataclasses
 import logging
 import struct
 import threading
-from typing import Type, TypeVar, Union
-
-import bluetooth
+from typing import TYPE_CHECKING, Type, TypeVar, Union
 
 from . import messages
 
+if TYPE_CHECKING:
+    # Imported lazily, since loading PyBluez isn't free.
+    import bluetooth
+
 LOGGER = logging.getLogger('galaxybudspro.frames')
 
-def crc16_ccitt(data: bytes):
+# CRC-16 (CCITT) lookup table for _crc16_ccitt_byte().
+_CRC16_TABLE = (
+    0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50A5, 0x60C6, 0x70E7, 0x8108, 0x9129, 0xA14A, 0xB16B, 0xC18C, 0xD1AD, 0xE1CE, 0xF1EF,
+    0x1231, 0x0210, 0x3273, 0x2252, 0x52B5, 0x4294, 0x72F7, 0x62D6, 0x9339, 0x8318, 0xB37B, 0xA35A, 0xD3BD, 0xC39C, 0xF3FF, 0xE3DE,
+    0x2462, 0x3443, 0x0420, 0x1401, 0x64E6, 0x74C7, 0x44A4, 0x5485, 0xA56A, 0xB54B, 0x8528, 0x9509, 0xE5EE, 0xF5CF, 0xC5AC, 0xD58D,
+    0x3653, 0x2672, 0x1611, 0x0630, 0x76D7, 0x66F6, 0x5695, 0x46B4, 0xB75B, 0xA77A, 0x9719, 0x8738, 0xF7DF, 0xE7FE, 0xD79D, 0xC7BC,
+    0x48C4, 0x58E5, 0x6886, 0x78A7, 0x0840, 0x1861, 0x2802, 0x3823, 0xC9CC, 0xD9ED, 0xE98E, 0xF9AF, 0x8948, 0x9969, 0xA90A, 0xB92B,
+    0x5AF5, 0x4AD4, 0x7AB7, 0x6A96, 0x1A71, 0x0A50, 0x3A33, 0x2A12, 0xDBFD, 0xCBDC, 0xFBBF, 0xEB9E, 0x9B79, 0x8B58, 0xBB3B, 0xAB1A,
+    0x6CA6, 0x7C87, 0x4CE4, 0x5CC5, 0x2C22, 0x3C03, 0x0C60, 0x1C41, 0xEDAE, 0xFD8F, 0xCDEC, 0xDDCD, 0xAD2A, 0xBD0B, 0x8D68, 0x9D49,
+    0x7E97, 0x6EB6, 0x5ED5, 0x4EF4, 0x3E13, 0x2E32, 0x1E51, 0x0E70, 0xFF9F, 0xEFBE, 0xDFDD, 0xCFFC, 0xBF1B, 0xAF3A, 0x9F59, 0x8F78,
+    0x9188, 0x81A9, 0xB1CA, 0xA1EB, 0xD10C, 0xC12D, 0xF14E, 0xE16F, 0x1080, 0x00A1, 0x30C2, 0x20E3, 0x5004, 0x4025, 0x7046, 0x6067,
+    0x83B9, 0x9398, 0xA3FB, 0xB3DA, 0xC33D, 0xD31C, 0xE37F, 0xF35E, 0x02B1, 0x1290, 0x22F3, 0x32D2, 0x4235, 0x5214, 0x6277, 0x7256,
+    0xB5EA, 0xA5CB, 0x95A8, 0x8589, 0xF56E, 0xE54F, 0xD52C, 0xC50D, 0x34E2, 0x24C3, 0x14A0, 0x0481, 0x7466, 0x6447, 0x5424, 0x4405,
+    0xA7DB, 0xB7FA, 0x8799, 0x97B8, 0xE75F, 0xF77E, 0xC71D, 0xD73C, 0x26D3, 0x36F2, 0x0691, 0x16B0, 0x6657, 0x7676, 0x4615, 0x5634,
+    0xD94C, 0xC96D, 0xF90E, 0xE92F, 0x99C8, 0x89E9, 0xB98A, 0xA9AB, 0x5844, 0x4865, 0x7806, 0x6827, 0x18C0, 0x08E1, 0x3882, 0x28A3,
+    0xCB7D, 0xDB5C, 0xEB3F, 0xFB1E, 0x8BF9, 0x9BD8, 0xABBB, 0xBB9A, 0x4A75, 0x5A54, 0x6A37, 0x7A16, 0x0AF1, 0x1AD0, 0x2AB3, 0x3A92,
+    0xFD2E, 0xED0F, 0xDD6C, 0xCD4D, 0xBDAA, 0xAD8B, 0x9DE8, 0x8DC9, 0x7C26, 0x6C07, 0x5C64, 0x4C45, 0x3CA2, 0x2C83, 0x1CE0, 0x0CC1,
+    0xEF1F, 0xFF3E, 0xCF5D, 0xDF7C, 0xAF9B, 0xBFBA, 0x8FD9, 0x9FF8, 0x6E17, 0x7E36, 0x4E55, 0x5E74, 0x2E93, 0x3EB2, 0x0ED1, 0x1EF0
+)
+
+def crc16_ccitt(data: bytes, crc: int=0):
     '''
-    CRC-16 (CCITT) implemented with a precomputed lookup table
+    CRC-16 (CCITT) using the C implementation in binascii.
 
-    From https://gist.github.com/oysstu/68072c44c02879a2abf94ef350d1c7c6?permalink_comment_id=3943460#gistcomment-3943460
+    The crc argument is the value to continue from, e.g. the CRC of a
+    preceding part of the data.
     '''
-    table = [
-        0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50A5, 0x60C6, 0x70E7, 0x8108, 0x9129, 0xA14A, 0xB16B, 0xC18C, 0xD1AD, 0xE1CE, 0xF1EF,
-        0x1231, 0x0210, 0x3273, 0x2252, 0x52B5, 0x4294, 0x72F7, 0x62D6, 0x9339, 0x8318, 0xB37B, 0xA35A, 0xD3BD, 0xC39C, 0xF3FF, 0xE3DE,
-        0x2462, 0x3443, 0x0420, 0x1401, 0x64E6, 0x74C7, 0x44A4, 0x5485, 0xA56A, 0xB54B, 0x8528, 0x9509, 0xE5EE, 0xF5CF, 0xC5AC, 0xD58D,
-        0x3653, 0x2672, 0x1611, 0x0630, 0x76D7, 0x66F6, 0x5695, 0x46B4, 0xB75B, 0xA77A, 0x9719, 0x8738, 0xF7DF, 0xE7FE, 0xD79D, 0xC7BC,
-        0x48C4, 0x58E5, 0x6886, 0x78A7, 0x0840, 0x1861, 0x2802, 0x3823, 0xC9CC, 0xD9ED, 0xE98E, 0xF9AF, 0x8948, 0x9969, 0xA90A, 0xB92B,
-        0x5AF5, 0x4AD4, 0x7AB7, 0x6A96, 0x1A71, 0x0A50, 0x3A33, 0x2A12, 0xDBFD, 0xCBDC, 0xFBBF, 0xEB9E, 0x9B79, 0x8B58, 0xBB3B, 0xAB1A,
-        0x6CA6, 0x7C87, 0x4CE4, 0x5CC5, 0x2C22, 0x3C03, 0x0C60, 0x1C41, 0xEDAE, 0xFD8F, 0xCDEC, 0xDDCD, 0xAD2A, 0xBD0B, 0x8D68, 0x9D49,
-        0x7E97, 0x6EB6, 0x5ED5, 0x4EF4, 0x3E13, 0x2E32, 0x1E51, 0x0E70, 0xFF9F, 0xEFBE, 0xDFDD, 0xCFFC, 0xBF1B, 0xAF3A, 0x9F59, 0x8F78,
-        0x9188, 0x81A9, 0xB1CA, 0xA1EB, 0xD10C, 0xC12D, 0xF14E, 0xE16F, 0x1080, 0x00A1, 0x30C2, 0x20E3, 0x5004, 0x4025, 0x7046, 0x6067,
-        0x83B9, 0x9398, 0xA3FB, 0xB3DA, 0xC33D, 0xD31C, 0xE37F, 0xF35E, 0x02B1, 0x1290, 0x22F3, 0x32D2, 0x4235, 0x5214, 0x6277, 0x7256,
-        0xB5EA, 0xA5CB, 0x95A8, 0x8589, 0xF56E, 0xE54F, 0xD52C, 0xC50D, 0x34E2, 0x24C3, 0x14A0, 0x0481, 0x7466, 0x6447, 0x5424, 0x4405,
-        0xA7DB, 0xB7FA, 0x8799, 0x97B8, 0xE75F, 0xF77E, 0xC71D, 0xD73C, 0x26D3, 0x36F2, 0x0691, 0x16B0, 0x6657, 0x7676, 0x4615, 0x5634,
-        0xD94C, 0xC96D, 0xF90E, 0xE92F, 0x99C8, 0x89E9, 0xB98A, 0xA9AB, 0x5844, 0x4865, 0x7806, 0x6827, 0x18C0, 0x08E1, 0x3882, 0x28A3,
-        0xCB7D, 0xDB5C, 0xEB3F, 0xFB1E, 0x8BF9, 0x9BD8, 0xABBB, 0xBB9A, 0x4A75, 0x5A54, 0x6A37, 0x7A16, 0x0AF1, 0x1AD0, 0x2AB3, 0x3A92,
-        0xFD2E, 0xED0F, 0xDD6C, 0xCD4D, 0xBDAA, 0xAD8B, 0x9DE8, 0x8DC9, 0x7C26, 0x6C07, 0x5C64, 0x4C45, 0x3CA2, 0x2C83, 0x1CE0, 0x0CC1,
-        0xEF1F, 0xFF3E, 0xCF5D, 0xDF7C, 0xAF9B, 0xBFBA, 0x8FD9, 0x9FF8, 0x6E17, 0x7E36, 0x4E55, 0x5E74, 0x2E93, 0x3EB2, 0x0ED1, 0x1EF0
-    ]
-
-    crc = 0
-    for byte in data:
-        crc = (crc << 8) ^ table[(crc >> 8) ^ byte]
-        crc &= 0xFFFF
-    return crc
+    return crc_hqx(data, crc)
+
+def _crc16_ccitt_byte(byte: int) -> int:
+    '''Returns crc16_ccitt(bytes([byte])), without creating the bytes.'''
+
+    return _CRC16_TABLE[byte]
+
+# SOF, flags and ID.
+_HEADER_STRUCT = struct.Struct('<BHB')
+# CRC and EOF.
+_TRAILER_STRUCT = struct.Struct('<HB')
 
 _FrameHeaderSubclass = TypeVar('_FrameHeaderSubclass', bound='FrameHeader')
 
@@ -65,7 +76,7 @@ class FrameHeader:
     def length(self): return self.flags & 0x3FF
 
     def encode(self) -> bytes:
-        return struct.pack('<BHB', 0xFD, self.flags, self.id)
+        return _HEADER_STRUCT.pack(0xFD, self.flags, self.id)
 
     @classmethod
     def parse(cls: Type[_FrameHeaderSubclass], data: bytes) -> tuple[_FrameHeaderSubclass, int]:
@@ -75,8 +86,8 @@ class FrameHeader:
         if data[0] != 0xFD:
             raise ValueError('invalid start-of-frame marker: 0x{:02X}'.format(data[0]))
 
-        (flags, id) = struct.unpack('<HB', data[1:4])
-        return cls(flags, id), 4
+        # Indexing is cheaper than a struct.unpack on a slice.
+        return cls(data[1] | data[2] << 8, data[3]), 4
 
     @classmethod
     def make(cls: Type[_FrameHeaderSubclass], id: int, length: int, response=False, fragment=False) -> _FrameHeaderSubclass:
@@ -101,7 +112,7 @@ class Frame:
                12   whether this is a fragment (i.e. not the last in a stream.)
       1 byte   message ID, i.e. the type of message.
       n bytes  message body, format depending on the ID.
-      2 bytes  CRC16-CCITT in big-endian.
+      2 bytes  CRC16-CCITT over the ID and body.
       1 byte   0xDD, end-of-frame marker.
     """
 
@@ -113,18 +124,18 @@ class Frame:
         return messages.parse_message(self.header.id, self.body)
 
     def encode(self) -> bytes:
-        return self.header.encode() + self.body + struct.pack('<HB', crc16_ccitt(bytes([self.header.id]) + self.body), 0xDD)
+        return self.header.encode() + self.body + _TRAILER_STRUCT.pack(crc16_ccitt(self.body, _crc16_ccitt_byte(self.header.id)), 0xDD)
 
     @classmethod
-    def parse(cls: Type[_FrameSubclass], header: FrameHeader, data: bytes) -> _FrameSubclass:
+    def parse(cls: Type[_FrameSubclass], header: FrameHeader, data: Union[bytes, memoryview]) -> _FrameSubclass:
         if len(data) < 2 or 1 + len(data) != header.length:
             raise ValueError('short frame length: {}'.format(len(data)))
 
-        crc = data[-1:] + data[-2:-1]
-        if crc16_ccitt(bytes([header.id]) + data[:-2] + crc) != 0:
+        body = data[:-2]
+        if crc16_ccitt(body, _crc16_ccitt_byte(header.id)) != data[-2] | data[-1] << 8:
             raise ValueError('invalid CRC')
 
-        return cls(header, data[:-2])
+        return cls(header, bytes(body))
 
     @classmethod
     def make(cls: Type[_FrameSubclass], id: int, msg: messages.Msg=None, **kwargs) -> _FrameSubclass:
@@ -137,9 +148,12 @@ class FrameReceiver:
     This class is not thread-safe.
     """
 
-    def __init__(self, sock: bluetooth.BluetoothSocket):
+    def __init__(self, sock: 'bluetooth.BluetoothSocket'):
+        import bluetooth
+
         self.__sock = sock
-        self.__recvbuf = b''
+        self.__bluetooth_error = bluetooth.btcommon.BluetoothError
+        self.__recvbuf = bytearray()
         self.__closed = threading.Event()
 
     def close(self):
@@ -158,13 +172,15 @@ class FrameReceiver:
         while True:
             # Find the next start-of-frame byte.
             self.__ensure_recvbuf(7) # SOF 2*Length ID [Body] 2*CRC EOF
-            for i in range(len(self.__recvbuf)):
-                if self.__recvbuf[i] == 0xFD:
-                    break
+            i = self.__recvbuf.find(0xFD)
+            if i < 0:
+                LOGGER.warning('Lost non-framed data: %s', bytes(self.__recvbuf))
+                self.__recvbuf.clear()
+                continue
             if i:
-                LOGGER.warning('Lost non-framed data: %s', self.__recvbuf[:i])
-                self.__recvbuf = self.__recvbuf[i:]
-            if not self.__recvbuf or self.__recvbuf[0] != 0xFD:
+                LOGGER.warning('Lost non-framed data: %s', bytes(self.__recvbuf[:i]))
+                del self.__recvbuf[:i]
+                # Make sure there is a full header again.
                 continue
 
             hdr, n = FrameHeader.parse(self.__recvbuf)
@@ -172,16 +188,25 @@ class FrameReceiver:
 
             # Confirm the end of frame byte.
             if self.__recvbuf[3 + hdr.length] != 0xDD:
-                LOGGER.warning('Lost data with bad framing: %s', self.__recvbuf[:3+hdr.length])
-                self.__recvbuf = self.__recvbuf[1:]
+                LOGGER.warning('Lost data with bad framing: %s', bytes(self.__recvbuf[:3+hdr.length]))
+                del self.__recvbuf[:1]
                 continue
 
-            data = self.__recvbuf[n:3+hdr.length]
-            self.__recvbuf = self.__recvbuf[3+hdr.length+1:]
-            try:
-                return Frame.parse(hdr, data)
-            except ValueError as ex:
-                LOGGER.warning('Lost invalid frame: %s', ex)
+            # The view, and any slice of it, must be released before
+            # the buffer is resized. The exception's traceback holds
+            # slices, so only its message may outlive the block.
+            frame = None
+            error = None
+            with memoryview(self.__recvbuf) as view:
+                try:
+                    frame = Frame.parse(hdr, view[n:3+hdr.length])
+                except ValueError as ex:
+                    error = str(ex)
+            del self.__recvbuf[:3+hdr.length+1]
+            if error:
+                LOGGER.warning('Lost invalid frame: %s', error)
+            if frame:
+                return frame
 
     def __ensure_recvbuf(self, n):
         """Ensures that __recvbuf contains at least n bytes."""
@@ -189,7 +214,7 @@ class FrameReceiver:
         while len(self.__recvbuf) < n:
             try:
                 data = self.__sock.recv(0x800)
-            except bluetooth.btcommon.BluetoothError as ex:
+            except self.__bluetooth_error as ex:
                 if self.__closed.is_set() and ex.errno == 9:
                     raise EOFError()
                 raise
@@ -198,7 +223,7 @@ class FrameReceiver:
                 if len(self.__recvbuf) < n:
                     raise IOError('short receive')
                 return
-            self.__recvbuf += data
+            self.__recvbuf.extend(data)
 
 class FrameDispatcher:
     """Receives frames in a background thread and invokes registered listeners.
@@ -211,7 +236,8 @@ class FrameDispatcher:
 
     def __init__(self, receiver: FrameReceiver):
         self.__receiver = receiver
-        self.__listeners = {}
+        # Tuples are copied on write, so the receive thread can read them without locking.
+        self.__listeners: dict[int, tuple[Callable[[Union[Frame, None]], None], ...]] = {}
 
         self.__lock = threading.Lock()
         self.__thread = threading.Thread(target=self.__run_recv, name=type(self).__name__)
@@ -228,6 +254,8 @@ class FrameDispatcher:
     def __run_recv(self) -> None:
         """Main function for the background thread."""
 
+        import bluetooth
+
         try:
             while True:
                 try:
@@ -236,8 +264,8 @@ class FrameDispatcher:
                     except EOFError:
                         break
 
-                    with self.__lock:
-                        listeners = list(self.__listeners.get(frame.header.id, []))
+                    # Entries are replaced, never mutated, so no lock is needed.
+                    listeners = self.__listeners.get(frame.header.id, ())
 
                     for func in listeners:
                         try:
@@ -272,9 +300,9 @@ class FrameDispatcher:
 
         """
         with self.__lock:
-            if id not in self.__listeners:
-                self.__listeners[id] = set()
-            self.__listeners[id].add(func)
+            funcs = self.__listeners.get(id, ())
+            if func not in funcs:
+                self.__listeners[id] = funcs + (func,)
 
     def unlisten(self, id: int, func: Callable[[Union[Frame, None]], None]) -> None:
         """Deregisters a function previously used in listen().
@@ -282,9 +310,14 @@ class FrameDispatcher:
         This is idempotent.
         """
         with self.__lock:
-            if id not in self.__listeners:
+            funcs = self.__listeners.get(id, ())
+            if func not in funcs:
                 return
-            self.__listeners[id].discard(func)
+            funcs = tuple(f for f in funcs if f != func)
+            if funcs:
+                self.__listeners[id] = funcs
+            else:
+                del self.__listeners[id]
 
     @contextlib.contextmanager
     def oneshot(self, id: int, timeout: float=None, predicate: Callable[[messages.Msg], bool]=lambda _: True) -> Callable[[], messages.Msg]:
@@ -301,14 +334,15 @@ class FrameDispatcher:
         done = threading.Event()
         data = []
         def listener(frame: Frame):
-            self.unlisten(id, listener)
             if frame:
                 msg = frame.message
                 if not predicate(msg):
+                    # Other oneshots may share the ID, so keep listening.
                     return
                 data.append(msg)
             else:
                 data.append(None)
+            self.unlisten(id, listener)
             done.set()
 
         def getter():
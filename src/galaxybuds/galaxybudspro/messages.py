@@ -1,12 +1,28 @@
 import dataclasses
 import struct
+from typing import Callable
 
 from . import redirect_messages
+from .redirect_messages import _dataclass
+
+# Precompiled formats used by the parsers.
+_STRUCT_2B = struct.Struct('<2B')
+_STRUCT_7B = struct.Struct('<7B')
+_STRUCT_10B = struct.Struct('<10B')
+_STRUCT_5SI = struct.Struct('<5sI')
+_STRUCT_B4I = struct.Struct('<B4I')
+_STRUCT_H = struct.Struct('<H')
+
+# The (high, low) nibbles of every possible byte value.
+_NIBBLES = tuple((v >> 4, v & 0x0F) for v in range(256))
+
+# Marks a lazily parsed field that has not been parsed yet.
+_UNPARSED = object()
 
 class Msg:
-    pass
+    __slots__ = ()
 
-@dataclasses.dataclass
+@_dataclass
 class MsgStringPair(Msg):
     data: [str, str]
 
@@ -15,10 +31,12 @@ class MsgStringPair(Msg):
         if len(data) % 2 == 1:
             raise ValueError('expected an even number of bytes for StringPair, got {}'.format(len(data)))
 
+        # Decoding from views avoids copying each half first.
         n = len(data) // 2
-        return cls((data[:n].decode('ascii'), data[n:].decode('ascii')))
+        with memoryview(data) as view:
+            return cls((str(view[:n], 'ascii'), str(view[n:], 'ascii')))
 
-@dataclasses.dataclass
+@_dataclass
 class MsgStatusUpdated(Msg):
     revision: int # always zero?
     battery_left: int
@@ -27,36 +45,19 @@ class MsgStatusUpdated(Msg):
     primary_earbud: int
     placement_left: int
     placement_right: int # lower nibble
-    _battery_case: int
-
-    @property
-    def battery_case(self):
-        if self._battery_case == 101:
-            return -1
-        return self._battery_case
+    battery_case: int # -1 if unknown
 
     @classmethod
     def parse(cls, data: bytes):
-        if len(data) < 7:
-            raise ValueError('expected at least 7 bytes ExtendedStatusUpdated, got {}'.format(len(data)))
-
-        i = 0
-        args = struct.unpack('<5B', data[i:i+5])
-        i += 5
-        args += (
-            data[i] >> 4,
-            data[i] & 0x0F,
-        )
-        i += 1
-        args += (data[i],)
-        i += 1
-
-        if i != len(data):
-            raise ValueError('unable to parse the MsgStatusUpdated, expected length {}, got {}'.format(i, len(data)))
+        if len(data) != _STRUCT_7B.size:
+            raise ValueError('unable to parse the MsgStatusUpdated, expected length {}, got {}'.format(_STRUCT_7B.size, len(data)))
 
-        return cls(*args)
+        revision, battery_left, battery_right, coupled, primary_earbud, placement, battery_case = _STRUCT_7B.unpack_from(data)
+        if battery_case == 101:
+            battery_case = -1
+        return cls(revision, battery_left, battery_right, coupled, primary_earbud, *_NIBBLES[placement], battery_case)
 
-@dataclasses.dataclass
+@_dataclass
 class MsgExtendedStatusUpdated(Msg):
     revision: int
     ear_type: int
@@ -66,7 +67,7 @@ class MsgExtendedStatusUpdated(Msg):
     primary_earbud: int
     placement_left: int  # 1: wearing, 2: table, 3: case
     placement_right: int # lower nibble
-    _battery_case: int
+    battery_case: int # -1 if unknown
     adjust_sound_sync: bool
     equalizer_type: int
     touchpad_config: bool
@@ -84,16 +85,15 @@ class MsgExtendedStatusUpdated(Msg):
     left_noise_controls_off: bool # bit 4, rev>=8
     left_noise_controls_ambient: bool # bit 5, rev>=8
     left_noise_controls_anc: bool # bit 6, rev>=8
-    _extra_high_ambient1: bool # rev<3
+    extra_high_ambient: bool # rev<3 or rev>=6
     speak_seamlessly: bool # rev>=3
     ambient_sound_level: int
     noise_reduction_level: int
     auto_switch_audio_output: bool
     detect_conversations: bool
-    _detect_conversations_duration: int
+    detect_conversations_duration: int
     spatial_audio: bool # rev>=2
     hearing_enhancements: int # rev>=5
-    _extra_high_ambient2: bool # rev>=6
     outside_double_tap: bool # rev>=7
     noise_controls_with_one_earbud: bool # rev>=8
     customize_ambient_sound_on: bool # rev>=8
@@ -103,12 +103,6 @@ class MsgExtendedStatusUpdated(Msg):
     side_tone: bool # rev>=9
     _call_path_control: bool # negated, if in_ear_detection feature (rev>=10 ?)
 
-    @property
-    def battery_case(self):
-        if self._battery_case == 101:
-            return -1
-        return self._battery_case
-
     @property
     def device_color(self):
         if (self.coupled and self._device_color[1]) or (not self.coupled and not self.primary_earbud):
@@ -119,135 +113,138 @@ class MsgExtendedStatusUpdated(Msg):
     def seamless_connection(self):
         return not self._seamless_connection
 
-    @property
-    def extra_high_ambient(self):
-        if self.revision < 3:
-            return self._extra_high_ambient1
-        if self.revision >= 6:
-            return self._extra_high_ambient2
-        return 0
-
-    @property
-    def detect_conversations_duration(self):
-        if self._detect_conversations_duration < 2:
-            return 1
-        return self._detect_conversations_duration
-
     @property
     def call_path_control(self):
         return not self._call_path_control
 
     @classmethod
     def parse(cls, data: bytes):
-        if len(data) < 25:
-            raise ValueError('expected at least 25 bytes ExtendedStatusUpdated, got {}'.format(len(data)))
-
-        i = 0
-        args = struct.unpack('<6B', data[i:i+6])
-        i += 6
-        args += (
-            data[i] >> 4,
-            data[i] & 0x0F,
-        )
+        # The generated parsers check the exact length of each revision.
+        if not data:
+            raise ValueError('unable to parse the MsgExtendedStatusUpdated, missing the revision')
+
+        # Later revisions only append fields, so anything newer parses like the newest known.
+        return _EXTENDED_STATUS_PARSERS[min(data[0], _EXTENDED_STATUS_MAX_REVISION)](cls, data)
+
+# The part of MsgExtendedStatusUpdated common to all revisions.
+_EXTENDED_STATUS_PREFIX = struct.Struct('<14B2H10B')
+
+# The noise controls bits 0-2 of every possible byte value.
+_NOISE_CONTROLS_FLAGS = tuple((v & 1 != 0, v & 2 != 0, v & 4 != 0) for v in range(256))
+
+# As _NOISE_CONTROLS_FLAGS, followed by the left earbud's bits 4-6, from revision 8.
+_LEFT_NOISE_CONTROLS_FLAGS = tuple(flags + (v & 16 != 0, v & 32 != 0, v & 64 != 0) for v, flags in enumerate(_NOISE_CONTROLS_FLAGS))
+
+def _extended_status_parser(rev: int) -> Callable[[type, bytes], MsgExtendedStatusUpdated]:
+    """Generates a MsgExtendedStatusUpdated parser for a single revision.
+
+    The layout only depends on the revision, so all offsets and
+    optional fields are resolved here, leaving straight-line code.
+    """
+    def byte(i):
+        # The fixed prefix is unpacked into locals named by offset.
+        if i < _EXTENDED_STATUS_PREFIX.size:
+            return 'p{}'.format(i)
+        return 'd[{}]'.format(i)
+
+    def flag(i):
+        return '{} != 0'.format(byte(i))
+
+    # Statements run after unpacking the prefix.
+    lines = [
+        'placement_left, placement_right = _NIBBLES[p6]',
+        'touchpad_option_left, touchpad_option_right = _NIBBLES[p11]',
+    ]
+    args = [
+        byte(0), byte(1), byte(2), byte(3), flag(4), byte(5),
+        'placement_left', 'placement_right',
+        '-1 if p7 == 101 else p7', flag(8), byte(9), flag(10),
+        'touchpad_option_left', 'touchpad_option_right',
+        byte(12), flag(13),
+        '(p14, p16)',
+        byte(18), flag(19), byte(20),
+        'nc_off', 'nc_ambient', 'nc_anc',
+    ]
+    if rev >= 8:
+        lines.append('nc_off, nc_ambient, nc_anc, left_nc_off, left_nc_ambient, left_nc_anc = _LEFT_NOISE_CONTROLS_FLAGS[p21]')
+        args += ['left_nc_off', 'left_nc_ambient', 'left_nc_anc']
+    else:
+        lines.append('nc_off, nc_ambient, nc_anc = _NOISE_CONTROLS_FLAGS[p21]')
+        args += ['False'] * 3
+
+    extra_high_ambient = len(args)
+    if rev < 3:
+        args += [flag(22), 'False']
+    else:
+        args += ['False', flag(22)]
+
+    args += [byte(23), byte(24), flag(25), flag(26), '1 if p27 < 2 else p27']
+    i = 28
+
+    if rev >= 2:
+        args.append(flag(i))
         i += 1
-        args += struct.unpack('<4B', data[i:i+4])
-        i += 4
-        args += (
-            data[i] >> 4,
-            data[i] & 0x0F,
-        )
+    else:
+        args.append('False')
+
+    if rev >= 5:
+        args.append(byte(i))
+        i += 1
+    else:
+        args.append('None')
+
+    if rev >= 6: # extraHighAmbient moved from earlier.
+        args[extra_high_ambient] = flag(i)
         i += 1
-        args += struct.unpack('<2B', data[i:i+2])
-        i += 2
-        v = struct.unpack('<2H', data[i:i+4])
-        args += (v,)
+
+    if rev >= 7:
+        args.append(flag(i))
+        i += 1
+    else:
+        args.append('False')
+
+    if rev >= 8:
+        lines.append('volume_left, volume_right = _NIBBLES[{}]'.format(byte(i + 2)))
+        args += [flag(i), flag(i + 1), 'volume_left', 'volume_right', byte(i + 3)]
         i += 4
-        args += struct.unpack('<3B', data[i:i+3])
-        i += 3
-        rev = args[0]
+    else:
+        args += ['False', 'False', 'None', 'None', 'None']
 
-        v = data[i]
+    if rev >= 9:
+        args.append(flag(i))
         i += 1
-        args += (
-            v & 1 != 0,
-            v & 2 != 0,
-            v & 4 != 0,
-        )
-        if rev >= 8:
-            args += (
-                v & 16 != 0,
-                v & 32 != 0,
-                v & 64 != 0,
-            )
-        else:
-            args += (None,) * 3
-
-        if rev < 3:
-            args += (data[i], None)
-            i += 1
-        else:
-            args += (None, data[i])
-            i += 1
-
-        args += struct.unpack('<5B', data[i:i+5])
-        i += 5
-
-        if rev >= 2:
-            args += (data[i] != 0,)
-            i += 1
-        else:
-            args += (None,)
-
-        if rev >= 5:
-            args += (data[i],)
-            i += 1
-        else:
-            args += (None,)
-
-        if rev >= 6: # extraHighAmbient moved from earlier.
-            args += (data[i] != 0,)
-            i += 1
-        else:
-            args += (None,)
-
-        if rev >= 7:
-            args += (data[i] != 0,)
-            i += 1
-        else:
-            args += (None,)
-
-        if rev >= 8:
-            v = struct.unpack('<4B', data[i:i+4])
-            i += 4
-            args += (
-                v[0] != 0,
-                v[1] != 0,
-                v[2] >> 4,
-                v[2] & 0x0F,
-                v[3],
-            )
-        else:
-            args += (None,) * 5
-
-        if rev >= 9:
-            args += (data[i],)
-            i += 1
-        else:
-            args += (None,)
-
-        if rev >= 10:
-            args += (data[i] == 0,)
-            i += 1
-        else:
-            args += (None,)
-
-        if i != len(data):
-            raise ValueError('unable to parse the MsgExtendedStatusUpdated, expected length {}, got {}'.format(i, len(data)))
-
-        args = [arg if field.type == int else bool(arg) for arg, field in zip(args, dataclasses.fields(cls))]
-        return cls(*args)
-
-@dataclasses.dataclass
+    else:
+        args.append('False')
+
+    if rev >= 10:
+        args.append('d[{}] == 0'.format(i))
+        i += 1
+    else:
+        args.append('False')
+
+    # The device color is two shorts, at offsets 14 and 16.
+    prefix = [byte(i) for i in range(14)] + ['p14', 'p16'] + [byte(i) for i in range(18, _EXTENDED_STATUS_PREFIX.size)]
+    src = '\n'.join([
+        'def parse(cls, d):',
+        '    if len(d) != {}:'.format(i),
+        "        raise ValueError('unable to parse the MsgExtendedStatusUpdated, expected length {}, got {{}}'.format(len(d)))".format(i),
+        '    {} = _EXTENDED_STATUS_PREFIX.unpack_from(d)'.format(', '.join(prefix)),
+    ] + ['    ' + line for line in lines] + [
+        '    return cls({})'.format(', '.join(args)),
+    ])
+    namespace = {}
+    exec(compile(src, '<MsgExtendedStatusUpdated revision {}>'.format(rev), 'exec'), {
+        '_EXTENDED_STATUS_PREFIX': _EXTENDED_STATUS_PREFIX,
+        '_NIBBLES': _NIBBLES,
+        '_LEFT_NOISE_CONTROLS_FLAGS': _LEFT_NOISE_CONTROLS_FLAGS,
+        '_NOISE_CONTROLS_FLAGS': _NOISE_CONTROLS_FLAGS,
+    }, namespace)
+    return namespace['parse']
+
+_EXTENDED_STATUS_MAX_REVISION = 10
+_EXTENDED_STATUS_PARSERS = tuple(_extended_status_parser(rev) for rev in range(_EXTENDED_STATUS_MAX_REVISION + 1))
+
+@_dataclass
 class MsgVersionInfo(Msg):
     right_hw_version: int
     left_hw_version: int
@@ -266,20 +263,9 @@ class MsgVersionInfo(Msg):
             raise ValueError('expected at least 10 bytes VersionInfo, got {}'.format(len(data)))
 
         # Galaxy Buds Pro have model number SM-R190, but this is implied.
-        return cls(
-            right_hw_version=data[0],
-            left_hw_version=data[1],
-            left_sw_version_flags=data[2],
-            left_sw_version_date=data[3],
-            left_sw_version_ver=data[4],
-            right_sw_version_flags=data[5],
-            right_sw_version_date=data[6],
-            right_sw_version_ver=data[7],
-            left_touch_fw_version=data[8],
-            right_touch_fw_version=data[9],
-        )
+        return cls(*_STRUCT_10B.unpack_from(data))
 
-@dataclasses.dataclass
+@_dataclass
 class MsgNoiseControlsUpdate(Msg):
     noise_controls_update: int
     wearing_state: int
@@ -289,12 +275,9 @@ class MsgNoiseControlsUpdate(Msg):
         if len(data) < 2:
             raise ValueError('expected at least 2 bytes NoiseControlsUpdate, got {}'.format(len(data)))
 
-        return cls(
-            noise_controls_update=data[0],
-            wearing_state=data[1],
-        )
+        return cls(*_STRUCT_2B.unpack_from(data))
 
-@dataclasses.dataclass
+@_dataclass
 class MsgVoiceWakeupListeningStatus(Msg):
     status: bool
 
@@ -307,7 +290,7 @@ class MsgVoiceWakeupListeningStatus(Msg):
             status=data[0],
         )
 
-@dataclasses.dataclass
+@_dataclass
 class MsgFotaResult(Msg):
     result: int
     error_code: int
@@ -317,12 +300,9 @@ class MsgFotaResult(Msg):
         if len(data) < 2:
             raise ValueError('expected at least 2 bytes FotaResult, got {}'.format(len(data)))
 
-        return cls(
-            result=data[0],
-            error_code=data[1],
-        )
+        return cls(*_STRUCT_2B.unpack_from(data))
 
-@dataclasses.dataclass
+@_dataclass
 class MsgUsageReport(Msg):
     entries: dict[int, int]
 
@@ -335,17 +315,12 @@ class MsgUsageReport(Msg):
         if len(data) - 1 != 9 * n:
             raise ValueError('expected {} bytes of data for {} entries, got {}'.format(9 * n, n, len(data) - 1))
 
-        def str_key(data):
-            v = data
-            ei = v.find(b'\x00')
-            if ei >= 0: v = data[:ei]
-            return v.decode('ascii')
-
+        # Keys are NUL-padded. The view avoids copying the entries.
         return cls(
-            entries={str_key(data[i:i+5]): struct.unpack('<I', data[i+5:i+9])[0] for i in range(1, 1 + 9*n, 9)},
+            entries={key.partition(b'\x00')[0].decode('ascii'): value for key, value in _STRUCT_5SI.iter_unpack(memoryview(data)[1:])},
         )
 
-@dataclasses.dataclass
+@_dataclass
 class MsgMeteringReport(Msg):
     format: int
     # Left, Right
@@ -363,34 +338,49 @@ class MsgMeteringReport(Msg):
             raise ValueError('expected at least 2 bytes MeteringReport, got {}'.format(len(data)))
 
         fmt = data[0]
-        connected_side = (data[1] >> 4, data[1] & 0x0F)
-        args = (fmt, connected_side)
+        connected_side = _NIBBLES[data[1]]
         i = 2
 
+        n = i + (_STRUCT_H.size if fmt >= 2 else 0) + _STRUCT_B4I.size * sum(1 for side in connected_side if side)
+        if len(data) < n:
+            raise ValueError('expected at least {} bytes MeteringReport, got {}'.format(n, len(data)))
+
+        total_battery_capacity = None
         if fmt >= 2:
-            args += struct.unpack('<H', data[i:i+2])
-            i += 2
-        else:
-            args += (None,)
-
-        sides = []
-        for j in range(2):
-            if connected_side[j]:
-                sides.append(struct.unpack('<B4I', data[i:i+17]))
-            else:
-                sides.append((None,) * 5)
-        args += tuple(zip(*sides))
-
-        return cls(*args)
-
-@dataclasses.dataclass
+            total_battery_capacity, = _STRUCT_H.unpack_from(data, i)
+            i += _STRUCT_H.size
+
+        left = right = (None,) * 5
+        if connected_side[0]:
+            left = _STRUCT_B4I.unpack_from(data, i)
+            i += _STRUCT_B4I.size
+        if connected_side[1]:
+            right = _STRUCT_B4I.unpack_from(data, i)
+            i += _STRUCT_B4I.size
+
+        return cls(
+            fmt,
+            connected_side,
+            total_battery_capacity,
+            (left[0], right[0]),
+            (left[1], right[1]),
+            (left[2], right[2]),
+            (left[3], right[3]),
+            (left[4], right[4]),
+        )
+
+@_dataclass
 class MsgUniversalAcknowledgement(Msg):
     redirect_id: int
     redirect_body: bytes
+    _redirect_message: redirect_messages.RedirectMsg = dataclasses.field(default=_UNPARSED, init=False, repr=False, compare=False)
 
     @property
     def redirect_message(self) -> redirect_messages.RedirectMsg:
-        return redirect_messages.parse_message(self.redirect_id, self.redirect_body)
+        # functools.cached_property needs a __dict__, which slotted instances lack.
+        if self._redirect_message is _UNPARSED:
+            self._redirect_message = redirect_messages.parse_message(self.redirect_id, self.redirect_body)
+        return self._redirect_message
 
     @classmethod
     def parse(cls, data: bytes):
@@ -402,7 +392,7 @@ class MsgUniversalAcknowledgement(Msg):
             redirect_body=data[1:],
         )
 
-@dataclasses.dataclass
+@_dataclass
 class MsgTouchPadOther(Msg):
     other_option: int
 
@@ -415,7 +405,7 @@ class MsgTouchPadOther(Msg):
             other_option=data[0],
         )
 
-@dataclasses.dataclass
+@_dataclass
 class MsgSimple(Msg):
     data: bytes
 
@@ -426,126 +416,85 @@ class MsgSimple(Msg):
     def parse(cls, data: bytes):
         return cls(data)
 
+# Parsers by message ID. Known IDs without parsers map to None.
+_PARSERS = {
+    0xAC: None,  # SetFmmConfig, SET_FMM_CONFIG
+    0xAD: None,  # GetFmmConfig, GET_FMM_CONFIG
+    # Handled by ShtCore and SppRecvHelper.
+    # First byte is type: 0x20: GRV, 0x21: Wear on update, 0x22: Wear off update, 0x23: Gyro bias, 0x24: Stuck info.
+    0xC2: MsgSimple.parse,  # (Spatial sensor data)
+    # Single byte: 2: addSuccess, 3: removeSuccess
+    0xC3: MsgSimple.parse,  # (Spatial sensor control)
+    0x4A: None,  # AgingTestReport
+    # Ignored in CoreServiceModel.
+    0x4B: MsgSimple.parse,
+    0x60: MsgStatusUpdated.parse,  # StatusUpdated, MSG_ID_STATUS_UPDATED
+    0x61: MsgExtendedStatusUpdated.parse,  # ExtendedStatusUpdated, MSG_ID_EXTENDED_STATUS_UPDATED
+    # Handled by CoreServiceModel.
+    0x22: MsgStringPair.parse,  # DebugSKU
+    0x26: None,  # DebugData, DEBUG_ALL_DATA
+    0x29: MsgStringPair.parse,  # DebugSerial, DEBUG_SERIAL_NUMBER
+    0x50: None,  # Reset
+    0x63: MsgVersionInfo.parse,  # VersionInfo, MSG_ID_VERSION_INFO
+    # Handled by CoreServiceModel.
+    0x77: MsgNoiseControlsUpdate.parse,  # NoiseControlsUpdate, MSG_ID_NOISE_CONTROLS_UPDATE
+    # Handled by CoreServiceModel.
+    0x9A: None,  # VoiceWakeUpEvent, VOICE_WAKE_UP_EVENT
+    # Handled by CoreServiceModel.
+    0x9B: None,  # NoiseReductionModeUpdated, NOISE_REDUCTION_MODE_UPDATE
+    # Handled by CoreServiceModel.
+    0x9C: MsgVoiceWakeupListeningStatus.parse,  # VoiceWakeUpListeningStatus, VOICE_WAKE_UP_LISTENING_STATUS
+    # Handled by DeviceLogManager.
+    0x31: None,  # LogCoredumpDataSize, LOG_COREDUMP_DATA_SIZE
+    0x32: None,  # LogCoredumpData, LOG_COREDUMP_DATA
+    0x33: None,  # LogCoredumpComplete, LOG_COREDUMP_COMPLETE
+    0x34: None,  # LogTraceStart, LOG_TRACE_START
+    0x35: None,  # LogTraceData, LOG_TRACE_DATA
+    0x36: None,  # LogTraceComplete, LOG_TRACE_COMPLETE
+    0x37: None,  # LogRoleSwitch, LOG_TRACE_ROLE_SWITCH
+    0x38: None,  # LogCoredumpTransmissionDone, LOG_COREDUMP_DATA_DONE
+    0x39: None,  # LogTraceTransmissionDone, LOG_TRACE_DATA_DONE
+    0x3A: None,  # LogSessionOpen, LOG_SESSION_OPEN
+    0x3B: None,  # LogSessionClose, LOG_SESSION_CLOSE
+    # Handled by FotaTransferManager.
+    0xB9: MsgFotaResult.parse,  # FotaResult, MSG_ID_FOTA_RESULT
+    # Sends MsgFotaEmergency 0xBA response.
+    0xBA: None,  # FotaEmergency, FOTA_EMERGENCY
+    0xBB: None,  # FotaSession, MSG_ID_FOTA_OPEN
+    # Sends MsgFotaControl.
+    0xBC: None,  # FotaControl, MSG_ID_FOTA_CONTROL
+    # Sends MsgFotaDownloadData.
+    0xBD: None,  # FotaDownloadData, MSG_ID_FOTA_DOWNLOAD_DATA
+    0xBE: None,  # FotaUpdated, MSG_ID_FOTA_UPDATE
+    # Handled by EarBudsUsageReporter.
+    # Sends MsgUsageReport(responseCode) back.
+    # We raise an exception instead of setting responseCode for now.
+    0x40: MsgUsageReport.parse,  # UsageReport, USAGE_REPORT
+    0x41: MsgMeteringReport.parse,  # MeteringReport, METERING
+    0x42: MsgUniversalAcknowledgement.parse,  # UniversalAcknowledgement, UNIVERSAL_MSG_ID_ACKNOWLEDGEMENT
+    0x88: None,  # ManagerInfo
+    0x8A: None,  # SetInBandRingtone, SET_IN_BAND_RINGTONE
+    # touchpadLocked = status == 1
+    0x91: None,  # TouchUpdated, TOUCH_UPDATED
+    # touchpadOtherOptionValue == 4 -> Spotify
+    # touchpadOtherOptionValue == 5 -> left something
+    # touchpadOtherOptionValue >= 6 -> right something
+    # MsgSetTouchpadOption TODO
+    0x93: MsgTouchPadOther.parse,  # TouchPadOther, TOUCHPAD_OTHER_OPTION
+    # Handled by CoreServiceModel.
+    0x9E: None,  # CheckTheFitOfEarbudsResult, CHECK_THE_FIT_OF_EARBUDS_RESULT
+    0xA1: MsgSimple.parse,  # FIND_MY_EARBUDS_STOP
+    0xA5: MsgSimple.parse,  # VOICE_NOTI_STOP
+    # Handled by AmbientSoundDuringsCallNotiReceiver
+    0x6D: MsgSimple.parse,  # AMBIENT_DURING_CALL_NOTI
+    0xA3: None,  # MuteEarbudStatusUpdated, MUTE_EARBUD_STATUS_UPDATED
+    0xB4: None,  # FotaDeviceInfoSwVersion, FOTA_DEVICE_INFO_SW_VERSION
+}
+
+# These don't seem to be parsed: 0x2D, 0x2E, 0x2F, 0x74, 0x75, 0xF1, 0xF2
+
 def parse_message(id: int, data: bytes):
-    if id == 0xAC:  # SetFmmConfig, SET_FMM_CONFIG
-        pass
-    elif id == 0xAD:  # GetFmmConfig, GET_FMM_CONFIG
-        pass
-    elif id == 0xC2:  # (Spatial sensor data)
-        # Handled by ShtCore and SppRecvHelper.
-        # First byte is type: 0x20: GRV, 0x21: Wear on update, 0x22: Wear off update, 0x23: Gyro bias, 0x24: Stuck info.
-        return MsgSimple.parse(data)
-    elif id == 0xC3:  # (Spatial sensor control)
-        # Single byte: 2: addSuccess, 3: removeSuccess
-        return MsgSimple.parse(data)
-    elif id == 0x4A:  # AgingTestReport
-        pass
-    elif id == 0x4B:
-        # Ignored in CoreServiceModel.
-        return MsgSimple.parse(data)
-    elif id == 0x60:  # StatusUpdated, MSG_ID_STATUS_UPDATED
-        return MsgStatusUpdated.parse(data)
-    elif id == 0x61:  # ExtendedStatusUpdated, MSG_ID_EXTENDED_STATUS_UPDATED
-        return MsgExtendedStatusUpdated.parse(data)
-    elif id == 0x22:  # DebugSKU
-        # Handled by CoreServiceModel.
-        return MsgStringPair.parse(data)
-    elif id == 0x26:  # DebugData, DEBUG_ALL_DATA
-        pass
-    elif id == 0x29:  # DebugSerial, DEBUG_SERIAL_NUMBER
-        return MsgStringPair.parse(data)
-    elif id == 0x50:  # Reset
-        pass
-    elif id == 0x63:  # VersionInfo, MSG_ID_VERSION_INFO
-        return MsgVersionInfo.parse(data)
-    elif id == 0x77:  # NoiseControlsUpdate, MSG_ID_NOISE_CONTROLS_UPDATE
-        # Handled by CoreServiceModel.
-        return MsgNoiseControlsUpdate.parse(data)
-    elif id == 0x9A:  # VoiceWakeUpEvent, VOICE_WAKE_UP_EVENT
-        # Handled by CoreServiceModel.
-        pass
-    elif id == 0x9B:  # NoiseReductionModeUpdated, NOISE_REDUCTION_MODE_UPDATE
-        # Handled by CoreServiceModel.
-        pass
-    elif id == 0x9C:  # VoiceWakeUpListeningStatus, VOICE_WAKE_UP_LISTENING_STATUS
-        # Handled by CoreServiceModel.
-        return MsgVoiceWakeupListeningStatus.parse(data)
-    elif id == 0x31:  # LogCoredumpDataSize, LOG_COREDUMP_DATA_SIZE
-        pass
-        # Handled by DeviceLogManager.
-    elif id == 0x32:  # LogCoredumpData, LOG_COREDUMP_DATA
-        pass
-    elif id == 0x33:  # LogCoredumpComplete, LOG_COREDUMP_COMPLETE
-        pass
-    elif id == 0x34:  # LogTraceStart, LOG_TRACE_START
-        pass
-    elif id == 0x35:  # LogTraceData, LOG_TRACE_DATA
-        pass
-    elif id == 0x36:  # LogTraceComplete, LOG_TRACE_COMPLETE
-        pass
-    elif id == 0x37:  # LogRoleSwitch, LOG_TRACE_ROLE_SWITCH
-        pass
-    elif id == 0x38:  # LogCoredumpTransmissionDone, LOG_COREDUMP_DATA_DONE
-        pass
-    elif id == 0x39:  # LogTraceTransmissionDone, LOG_TRACE_DATA_DONE
-        pass
-    elif id == 0x3A:  # LogSessionOpen, LOG_SESSION_OPEN
-        pass
-    elif id == 0x3B:  # LogSessionClose, LOG_SESSION_CLOSE
-        pass
-    elif id == 0xB9:  # FotaResult, MSG_ID_FOTA_RESULT
-        # Handled by FotaTransferManager.
-        return MsgFotaResult.parse(data)
-    elif id == 0xBA:  # FotaEmergency, FOTA_EMERGENCY
-        pass
-        # Sends MsgFotaEmergency 0xBA response.
-    elif id == 0xBB:  # FotaSession, MSG_ID_FOTA_OPEN
-        pass
-    elif id == 0xBC:  # FotaControl, MSG_ID_FOTA_CONTROL
-        # Sends MsgFotaControl.
-        pass
-    elif id == 0xBD:  # FotaDownloadData, MSG_ID_FOTA_DOWNLOAD_DATA
-        # Sends MsgFotaDownloadData.
-        pass
-    elif id == 0xBE:  # FotaUpdated, MSG_ID_FOTA_UPDATE
-        pass
-    elif id == 0x40:  # UsageReport, USAGE_REPORT
-        # Handled by EarBudsUsageReporter.
-        # Sends MsgUsageReport(responseCode) back.
-        # We raise an exception instead of setting responseCode for now.
-        return MsgUsageReport.parse(data)
-    elif id == 0x41:  # MeteringReport, METERING
-        return MsgMeteringReport.parse(data)
-    elif id == 0x42:  # UniversalAcknowledgement, UNIVERSAL_MSG_ID_ACKNOWLEDGEMENT
-        return MsgUniversalAcknowledgement.parse(data)
-    elif id == 0x88:  # ManagerInfo
-        pass
-    elif id == 0x8A:  # SetInBandRingtone, SET_IN_BAND_RINGTONE
-        pass
-    elif id == 0x91:  # TouchUpdated, TOUCH_UPDATED
-        # touchpadLocked = status == 1
-        pass
-    elif id == 0x93:  # TouchPadOther, TOUCHPAD_OTHER_OPTION
-        # touchpadOtherOptionValue == 4 -> Spotify
-        # touchpadOtherOptionValue == 5 -> left something
-        # touchpadOtherOptionValue >= 6 -> right something
-        # MsgSetTouchpadOption TODO
-        return MsgTouchPadOther.parse(data)
-    elif id == 0x9E:  # CheckTheFitOfEarbudsResult, CHECK_THE_FIT_OF_EARBUDS_RESULT
-        # Handled by CoreServiceModel.
-        pass
-    elif id == 0xA1: # FIND_MY_EARBUDS_STOP
-        return MsgSimple.parse(data)
-    elif id == 0xA5: # VOICE_NOTI_STOP
-        return MsgSimple.parse(data)
-    elif id == 0x6D: # AMBIENT_DURING_CALL_NOTI
-        # Handled by AmbientSoundDuringsCallNotiReceiver
-        return MsgSimple.parse(data)
-    elif id == 0xA3:  # MuteEarbudStatusUpdated, MUTE_EARBUD_STATUS_UPDATED
-        pass
-    elif id == 0xB4:  # FotaDeviceInfoSwVersion, FOTA_DEVICE_INFO_SW_VERSION
-        pass
-
-    # These don't seem to be parsed: 0x2D, 0x2E, 0x2F, 0x74, 0x75, 0xF1, 0xF2
-
-    return None
+    parse = _PARSERS.get(id)
+    if parse is None:
+        return None
+    return parse(data)
@@ -1,9 +1,17 @@
 import dataclasses
+import functools
+import sys
+
+# Slotted instances skip the per-object __dict__, but need Python 3.10.
+if sys.version_info >= (3, 10):
+    _dataclass = functools.partial(dataclasses.dataclass, slots=True)
+else:
+    _dataclass = dataclasses.dataclass
 
 class RedirectMsg:
-    pass
+    __slots__ = ()
 
-@dataclasses.dataclass
+@_dataclass
 class RedirectMsgNoiseControls(RedirectMsg):
     noise_controls: int
 
@@ -14,8 +22,13 @@ class RedirectMsgNoiseControls(RedirectMsg):
 
         return cls(data[0])
 
-def parse_message(id: int, data: bytes) -> RedirectMsg:
-    if id == 0x78:
-        return RedirectMsgNoiseControls.parse(data)
+# Parsers by redirected message ID.
+_PARSERS = {
+    0x78: RedirectMsgNoiseControls.parse,
+}
 
-    return None
+def parse_message(id: int, data: bytes) -> RedirectMsg:
+    parse = _PARSERS.get(id)
+    if parse is None:
+        return None
+    return parse(data)
@@ -1,10 +1,37 @@
 import dataclasses
+import logging
+import operator
 import struct
 import threading
-from typing import Callable
+from typing import Callable, Union
 
 from . import frames, messages
 
+LOGGER = logging.getLogger('galaxybudspro.requests')
+
+# Precompiled formats used by the request builders.
+_STRUCT_B = struct.Struct('<B')
+_STRUCT_2B = struct.Struct('<2B')
+_STRUCT_LI = struct.Struct('<LI')
+
+# Fields of MsgExtendedStatusUpdated, and the positions in it of MsgStatusUpdated's fields.
+_EXTENDED_STATUS_FIELDS = tuple(field.name for field in dataclasses.fields(messages.MsgExtendedStatusUpdated))
+_STATUS_FIELDS = tuple(field.name for field in dataclasses.fields(messages.MsgStatusUpdated) if field.name != 'revision')
+_STATUS_FIELD_POSITIONS = tuple(_EXTENDED_STATUS_FIELDS.index(name) for name in _STATUS_FIELDS)
+_get_extended_status_fields = operator.attrgetter(*_EXTENDED_STATUS_FIELDS)
+_get_status_fields = operator.attrgetter(*_STATUS_FIELDS)
+
+def _merge_status(ext_status: messages.MsgExtendedStatusUpdated, status: messages.MsgStatusUpdated) -> messages.MsgExtendedStatusUpdated:
+    """Returns a copy of the extended status, with fields updated from a status message.
+
+    Unlike dataclasses.replace(), this does not look up fields by
+    name on every call.
+    """
+    args = list(_get_extended_status_fields(ext_status))
+    for i, v in zip(_STATUS_FIELD_POSITIONS, _get_status_fields(status)):
+        args[i] = v
+    return type(ext_status)(*args)
+
 def debug_sku():
     return frames.Frame.make(0x22)
 
@@ -15,22 +42,22 @@ def debug_serial_number():
     return frames.Frame.make(0x29)
 
 def usage_report_response(code):
-    return frames.Frame.make(0x40, messages.MsgSimple(struct.pack('<B', code)), response=True)
+    return frames.Frame.make(0x40, messages.MsgSimple(_STRUCT_B.pack(code)), response=True)
 
 def noise_controls(v: int):
-    return frames.Frame.make(0x78, messages.MsgSimple(struct.pack('<B', v)))
+    return frames.Frame.make(0x78, messages.MsgSimple(_STRUCT_B.pack(v)))
 
 def set_equalizer_type(v: int):
-    return frames.Frame.make(0x86, messages.MsgSimple(struct.pack('<B', v)))
+    return frames.Frame.make(0x86, messages.MsgSimple(_STRUCT_B.pack(v)))
 
 def lock_touchpad(v: bool):
-    return frames.Frame.make(0x90, messages.MsgSimple(struct.pack('<B', int(v))))
+    return frames.Frame.make(0x90, messages.MsgSimple(_STRUCT_B.pack(int(v))))
 
 def set_touchpad_option(left: int, right: int):
-    return frames.Frame.make(0x92, messages.MsgSimple(struct.pack('<BB', left, right)))
+    return frames.Frame.make(0x92, messages.MsgSimple(_STRUCT_2B.pack(left, right)))
 
 def set_noise_reduction(v: bool):
-    return frames.Frame.make(0x98, messages.MsgSimple(struct.pack('<B', int(v))))
+    return frames.Frame.make(0x98, messages.MsgSimple(_STRUCT_B.pack(int(v))))
 
 def start_find_my_earbuds():
     return frames.Frame.make(0xA0)
@@ -39,10 +66,10 @@ def stop_find_my_earbuds():
     return frames.Frame.make(0xA1)
 
 def mute_earbud(left: bool, right: bool):
-    return frames.Frame.make(0xA2, messages.MsgSimple(struct.pack('<BB', int(left), int(right))))
+    return frames.Frame.make(0xA2, messages.MsgSimple(_STRUCT_2B.pack(int(left), int(right))))
 
 def update_time(time: int, tzoffset: int):
-    return frames.Frame.make(0xA7, messages.MsgSimple(struct.pack('<LI', time, tzoffset)))
+    return frames.Frame.make(0xA7, messages.MsgSimple(_STRUCT_LI.pack(time, tzoffset)))
 
 class MessageCache:
     """Listens for common messages and stores the last per type.
@@ -50,7 +77,8 @@ class MessageCache:
     On construction, the values are all None. When the dispatcher is
     closed, the values are again set to None.
 
-    This class is thread-safe.
+    This class is thread-safe. Values are only replaced with the
+    condition held, so the properties read them without locking.
     """
 
     def __init__(self, dispatcher: frames.FrameDispatcher):
@@ -58,6 +86,7 @@ class MessageCache:
         self.__data = {}
         self.__unlistens = []
         self.__merged_extended_status = None
+        self.__merged_extended_status_listeners = set()
 
         for id in [0x40, 0x41, 0x60, 0x61, 0x63, 0x77, 0x9C, 0xB9]:
             self.__unlistens.append(self.__listen(id))
@@ -71,7 +100,7 @@ class MessageCache:
                 if not frame:
                     # Let the callers know that there is no more data.
                     if id == 0x61:
-                        self.__merged_extended_status = None
+                        self.__set_merged_extended_status(None)
 
                     self.__data[id] = None
                     self.__cond.notify_all()
@@ -80,11 +109,9 @@ class MessageCache:
                 # The earbuds start a connection by bursting extended
                 # status, but then uses smaller updates.
                 if id == 0x60 and self.__merged_extended_status:
-                    fields = dataclasses.asdict(frame.message)
-                    fields.pop('revision')
-                    self.__merged_extended_status = dataclasses.replace(self.__merged_extended_status, **fields)
+                    self.__set_merged_extended_status(_merge_status(self.__merged_extended_status, frame.message))
                 elif id == 0x61:
-                    self.__merged_extended_status = dataclasses.replace(frame.message)
+                    self.__set_merged_extended_status(dataclasses.replace(frame.message))
 
                 self.__data[id] = frame.message
                 self.__cond.notify_all()
@@ -92,6 +119,17 @@ class MessageCache:
         self.__dispatcher.listen(id, setter)
         return lambda: self.__dispatcher.unlisten(id, setter)
 
+    def __set_merged_extended_status(self, status: messages.MsgExtendedStatusUpdated) -> None:
+        """Updates the merged status and invokes listeners. Must be called with __cond held."""
+
+        self.__merged_extended_status = status
+
+        for func in list(self.__merged_extended_status_listeners):
+            try:
+                func(status)
+            except Exception:
+                LOGGER.exception('MessageCache listener failure (ignored)', exc_info=True)
+
     def close(self):
         """Deregisters from the frame dispatcher."""
 
@@ -99,6 +137,29 @@ class MessageCache:
             func()
         self.__unlistens = []
 
+    def listen_for_merged_extended_status(self, func: Callable[[Union[messages.MsgExtendedStatusUpdated, None]], None]) -> Callable[[], None]:
+        """Registers a function to be invoked when latest_merged_extended_status changes.
+
+        If there is a current status, the function is invoked with it
+        immediately. When the dispatcher is closed, the function is
+        invoked with None.
+
+        The function is invoked from the dispatcher thread, with an
+        internal lock held, and must not block.
+
+        Returns a function to cancel the listener.
+        """
+        with self.__cond:
+            self.__merged_extended_status_listeners.add(func)
+            if self.__merged_extended_status:
+                func(self.__merged_extended_status)
+
+        def unlisten():
+            with self.__cond:
+                self.__merged_extended_status_listeners.discard(func)
+
+        return unlisten
+
     def wait_for(self, predicate: Callable[[], bool]):
         """Waits until a specific predicate returns true.
 
@@ -112,19 +173,19 @@ class MessageCache:
 
     @property
     def latest_usage_report(self):
-        with self.__cond: return self.__data[0x40]
+        return self.__data[0x40]
 
     @property
     def latest_metering_report(self):
-        with self.__cond: return self.__data[0x41]
+        return self.__data[0x41]
 
     @property
     def latest_status(self):
-        with self.__cond: return self.__data[0x60]
+        return self.__data[0x60]
 
     @property
     def latest_extended_status(self):
-        with self.__cond: return self.__data[0x61]
+        return self.__data[0x61]
 
     @property
     def latest_merged_extended_status(self) -> messages.MsgExtendedStatusUpdated:
@@ -134,20 +195,20 @@ class MessageCache:
         but then uses smaller updates. Prefer this over the raw
         latest_extended_status.
         """
-        with self.__cond: return self.__merged_extended_status
+        return self.__merged_extended_status
 
     @property
     def version_info(self):
-        with self.__cond: return self.__data[0x63]
+        return self.__data[0x63]
 
     @property
     def latest_noise_controls_updated(self):
-        with self.__cond: return self.__data[0x77]
+        return self.__data[0x77]
 
     @property
     def latest_voice_wakeup_listening_status(self):
-        with self.__cond: return self.__data[0x9C]
+        return self.__data[0x9C]
 
     @property
     def latest_fota_result(self):
-        with self.__cond: return self.__data[0xB9]
+        return self.__data[0xB9]